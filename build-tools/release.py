@@ -5,14 +5,20 @@ import sys
 from pathlib import Path
 
 
-def run(cmd: str, check=True, shell=True):
-    """Выполняет команду с безопасным чтением вывода"""
-    print(f"🔧 Выполняю: {cmd}")
+def run(cmd: list, check=True, capture=True):
+    """
+    Выполняет команду без запуска оболочки.
+
+    Args:
+        cmd: команда и аргументы списком
+        check: завершать скрипт при ненулевом коде возврата
+        capture: перехватывать вывод (для интерактивных команд — False)
+    """
+    print(f"🔧 Выполняю: {' '.join(cmd)}")
     result = subprocess.run(
         cmd,
-        shell=shell,
         cwd=ROOT_DIR,
-        capture_output=True,
+        capture_output=capture,
         text=True,
         encoding='utf-8',
         errors='replace'
@@ -70,19 +76,27 @@ def main():
         sys.exit(1)
 
     # Git команды
-    run("git add VERSION")
-    run(f'git commit -m "chore: bump version to {version}"')
-    run("git checkout main")
+    run(["git", "add", "VERSION"])
+    run(["git", "commit", "-m", f"chore: bump version to {version}"])
+    run(["git", "checkout", "main"])
 
     # Merge (не критичен)
     merge_result = run(
-        "git merge HEAD@{1} --no-ff -m 'chore: merge release branch'", check=False)
+        ["git", "merge", "HEAD@{1}", "--no-ff", "-m", "chore: merge release branch"],
+        check=False)
     if merge_result.returncode != 0:
         print("ℹ️  Merge не требуется или уже выполнен")
 
-    run("git push origin main")
-    run(f"git tag {tag_name}")
-    run(f"git push origin {tag_name}")
+    run(["git", "tag", tag_name])
+    # Ветка и тег отправляются одним атомарным push: если main отклонён,
+    # тег тоже не попадёт на GitHub (и не запустит сборку релиза).
+    # Вывод не перехватывается, чтобы git мог запросить учётные данные
+    push_result = run(["git", "push", "--atomic", "origin", "main", tag_name],
+                      check=False, capture=False)
+    if push_result.returncode != 0:
+        run(["git", "tag", "-d", tag_name], check=False)
+        print(f"❌ Ошибка выполнения команды: {push_result.returncode}")
+        sys.exit(push_result.returncode)
 
     print("\n" + "✅" * 50)
     print(f"🎉 Выпуск {tag_name} запущен!")
@@ -5,6 +5,7 @@
 
 
 from typing import List, Callable
+import multiprocessing
 import sys
 import os
 
@@ -101,4 +102,6 @@ def debug_cli():
 
 
 if __name__ == '__main__':
+    # Нужно для пула процессов в собранном .exe
+    multiprocessing.freeze_support()
     debug_cli()
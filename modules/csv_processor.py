@@ -5,15 +5,23 @@
 """
 
 import logging
-from typing import List, Dict, Callable
+import logging.handlers
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Callable, Optional
 from pathlib import Path
 
 # Импортируем необходимые модули
-from .csv_reader import read_encoding, iter_csv_rows, gen_uid
-from .xml_generator import create_access_generator, format_xml_pretty
+from .csv_reader import read_encoding, read_file_bytes, iter_csv_rows, gen_uid
+from .xml_generator import create_access_generator, find_uid_field, AccessXMLGenerator
 from .config_manager import get_config_value
 
 
+# Число XML-фрагментов, накапливаемых перед записью в файл
+FRAGMENT_FLUSH_SIZE = 20000
+
+
 class CSVProcessor:
     """
     Универсальный процессор CSV файлов.
@@ -35,7 +43,8 @@ class CSVProcessor:
         csv_file_path: str,
         xml_file_path: str,
         logger: logging.Logger,
-        allow_headdep_recursive: bool = True  # для совместимости, не используется
+        allow_headdep_recursive: bool = True,  # для совместимости, не используется
+        xml_generator: Optional[AccessXMLGenerator] = None
     ) -> bool:
         """
         Потоковая обработка CSV-файла с генерацией XML.
@@ -47,6 +56,8 @@ class CSVProcessor:
             xml_file_path: путь к выходному XML-файлу
             logger: логгер для записи событий
             allow_headdep_recursive: флаг для совместимости (не используется)
+            xml_generator: генератор XML для повторного использования
+                (если не передан — создаётся новый)
 
         Returns:
             bool: True если обработка успешна, иначе False
@@ -61,38 +72,59 @@ class CSVProcessor:
                 f"Ошибка определения кодировки файла {csv_file_path}: {e}")
             return False
 
-        # Создаем генератор XML
-        xml_generator = create_access_generator()
+        # Файл читается с диска один раз; байты декодируются в iter_csv_rows
+        # (с перебором fallback-кодировок) и сразу освобождаются
+        try:
+            rows = iter_csv_rows(csv_file_path, encoding, self.required_fields, logger,
+                                 preloaded_bytes=read_file_bytes(csv_file_path))
+        except OSError as e:
+            logger.error(f"Ошибка чтения файла {csv_file_path}: {e}")
+            return False
+
+        # Создаем генератор XML, если не передан готовый
+        if xml_generator is None:
+            xml_generator = create_access_generator()
 
-        def generate_content(xf):
+        def generate_content(write):
             """Генератор контента для XML файла."""
             roles_added = 0
             logger.debug("Добавление FullModel в XML")
-            xml_generator.add_full_model(
-                xf, self.model_version, self.model_name)
+            fragments = [xml_generator.full_model_str(
+                self.model_version, self.model_name)]
+
+            # Поле с UID объекта одинаково для всех строк файла —
+            # определяется по первой строке
+            object_uid_field = None
 
             # Обрабатываем каждую строку
-            for line_num, row in iter_csv_rows(csv_file_path, encoding, self.required_fields, logger):
+            for line_num, row in rows:
+                if object_uid_field is None:
+                    object_uid_field = find_uid_field(row.keys())
+
                 # Передаём всю строку как есть — генератор сам найдёт нужные поля
                 logger.info(
                     f"Строка {line_num}: Обработка записи с полями: {list(row.keys())}")
 
                 # Генерируем структуру
-                xml_generator.add_role_structure(
-                    xf,
+                fragments.append(xml_generator.add_role_structure_str(
                     data=row,
                     folder_uid=folder_uid,
-                    logger=logger
-                )
+                    logger=logger,
+                    object_uid_field=object_uid_field
+                ))
                 roles_added += 1
 
+                # Небольшие файлы пишутся одним вызовом, большие — порциями
+                if len(fragments) >= FRAGMENT_FLUSH_SIZE:
+                    write(''.join(fragments))
+                    fragments.clear()
+
+            write(''.join(fragments))
             logger.info(f"Всего добавлено ролей: {roles_added}")
 
         try:
             logger.debug("Начало генерации XML")
-            xml_generator.generate_xml(xml_file_path, generate_content)
-            logger.debug("Форматирование XML с отступами")
-            format_xml_pretty(xml_file_path)
+            xml_generator.generate_xml_str(xml_file_path, generate_content)
             logger.info(f"XML успешно сохранён: {xml_file_path}")
             return True
         except Exception as e:
@@ -100,14 +132,80 @@ class CSVProcessor:
             return False
 
 
+# Состояние рабочего процесса пула (задаётся в _init_worker)
+_worker_log_queue = None
+_worker_csv_processor = None
+_worker_xml_generator = None
+
+
+def _init_worker(log_queue) -> None:
+    """
+    Инициализирует рабочий процесс пула.
+    Процессор и генератор XML создаются один раз на процесс
+    и используются для всех его файлов.
+
+    Args:
+        log_queue: очередь для передачи записей лога в основной процесс
+    """
+    global _worker_log_queue, _worker_csv_processor, _worker_xml_generator
+    _worker_log_queue = log_queue
+    _worker_csv_processor = CSVProcessor()
+    _worker_xml_generator = create_access_generator()
+
+
+def _process_one(args: tuple) -> tuple:
+    """
+    Обрабатывает один CSV-файл в рабочем процессе.
+    Логгер создаётся заново внутри процесса (логгеры не сериализуются),
+    записи пересылаются в основной процесс через очередь.
+
+    Args:
+        args: (csv_filename, folder_uid, csv_file_path, xml_file_path,
+               log_level, allow_headdep_recursive)
+
+    Returns:
+        tuple: (имя CSV-файла, успешно ли обработан)
+    """
+    (csv_filename, folder_uid, csv_file_path, xml_file_path,
+     log_level, allow_headdep_recursive) = args
+
+    logger = logging.getLogger(csv_filename)
+    logger.setLevel(log_level)
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.addHandler(logging.handlers.QueueHandler(_worker_log_queue))
+
+    success = _worker_csv_processor.process_csv_file_stream(
+        folder_uid, csv_file_path, xml_file_path, logger,
+        allow_headdep_recursive=allow_headdep_recursive,
+        xml_generator=_worker_xml_generator
+    )
+    return csv_filename, success
+
+
+class _LoggerRouter(logging.Handler):
+    """Handler, передающий записи из рабочих процессов логгерам по имени."""
+
+    def __init__(self, loggers: Dict[str, logging.Logger]):
+        super().__init__()
+        self.loggers = loggers
+
+    def emit(self, record):
+        logger = self.loggers.get(record.name)
+        if logger is not None:
+            logger.handle(record)
+
+
 class BatchProcessor:
     """
     Класс для пакетной обработки CSV файлов.
+    Файлы независимы друг от друга и обрабатываются параллельно в пуле процессов.
     """
 
     def __init__(self):
         """Инициализация пакетного процессора."""
         self.csv_processor = CSVProcessor()
+        self.xml_generator = create_access_generator()
 
     def process_file_list(
         self,
@@ -115,7 +213,8 @@ class BatchProcessor:
         csv_dir: str,
         file_list: List[str],
         logger_factory: Callable[[str], logging.Logger],
-        allow_headdep_recursive: bool = True
+        allow_headdep_recursive: bool = True,
+        max_workers: Optional[int] = None
     ) -> Dict[str, bool]:
         """
         Обрабатывает список CSV файлов.
@@ -126,12 +225,17 @@ class BatchProcessor:
             file_list: список файлов для обработки
             logger_factory: фабрика логгеров
             allow_headdep_recursive: флаг для совместимости
+            max_workers: число рабочих процессов
+                (по умолчанию — min(число файлов, число ядер))
 
         Returns:
             Dict[str, bool]: результаты обработки файлов
         """
-        results = {}
+        if max_workers is None:
+            max_workers = min(len(file_list), os.cpu_count() or 1)
 
+        loggers = {}
+        args_list = []
         for csv_filename in file_list:
             csv_file_path = str(Path(csv_dir) / csv_filename)
             xml_filename = Path(csv_filename).stem + '.xml'
@@ -139,16 +243,67 @@ class BatchProcessor:
 
             logger = logger_factory(csv_filename)
             logger.info(f"Начало обработки файла: {csv_filename}")
+            loggers[csv_filename] = logger
 
-            success = self.csv_processor.process_csv_file_stream(
-                folder_uid, csv_file_path, xml_file_path, logger,
-                allow_headdep_recursive=allow_headdep_recursive
-            )
+            args_list.append((
+                csv_filename, folder_uid, csv_file_path, xml_file_path,
+                logger.getEffectiveLevel(), allow_headdep_recursive
+            ))
+
+        if max_workers <= 1:
+            results = self._process_sequential(args_list, loggers)
+        else:
+            results = self._process_parallel(args_list, loggers, max_workers)
 
-            results[csv_filename] = success
+        for csv_filename, success in results.items():
             status = "успешно" if success else "с ошибкой"
-            logger.info(f"Обработка файла {csv_filename} завершена: {status}")
+            loggers[csv_filename].info(
+                f"Обработка файла {csv_filename} завершена: {status}")
+
+        return results
+
+    def _process_sequential(
+        self,
+        args_list: List[tuple],
+        loggers: Dict[str, logging.Logger]
+    ) -> Dict[str, bool]:
+        """Обрабатывает файлы по очереди в текущем процессе."""
+        results = {}
+        for (csv_filename, folder_uid, csv_file_path, xml_file_path,
+             _, allow_headdep_recursive) in args_list:
+            results[csv_filename] = self.csv_processor.process_csv_file_stream(
+                folder_uid, csv_file_path, xml_file_path, loggers[csv_filename],
+                allow_headdep_recursive=allow_headdep_recursive,
+                xml_generator=self.xml_generator
+            )
+        return results
 
+    def _process_parallel(
+        self,
+        args_list: List[tuple],
+        loggers: Dict[str, logging.Logger],
+        max_workers: int
+    ) -> Dict[str, bool]:
+        """
+        Обрабатывает файлы в пуле процессов.
+        Записи лога из рабочих процессов возвращаются через очередь
+        и передаются логгерам, созданным фабрикой в основном процессе.
+        """
+        results = {}
+        log_queue = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(
+            log_queue, _LoggerRouter(loggers))
+        listener.start()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(log_queue,)
+            ) as ex:
+                for name, ok in ex.map(_process_one, args_list):
+                    results[name] = ok
+        finally:
+            listener.stop()
         return results
 
 
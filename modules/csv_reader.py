@@ -3,14 +3,45 @@
 Универсальный — не зависит от семантики полей, работает с любыми required_fields из конфига.
 """
 
-import chardet
+from chardet.universaldetector import UniversalDetector
+import codecs
 import csv
+import functools
+import io
 import os
-from typing import Dict, List, Tuple, Generator, Any
+import re
+from collections.abc import Mapping
+from typing import Dict, List, Tuple, Generator, Any, Iterator, Callable, Optional, TextIO
 from .config_manager import get_config_value
 import uuid
 import logging
 
+try:
+    import pandas as pd
+except ImportError:  # pandas не обязателен — используется модуль csv
+    pd = None
+
+
+# Размер блока и предел байт, подаваемых детектору кодировки
+ENCODING_CHUNK_SIZE = 64 * 1024
+ENCODING_MAX_BYTES = 1024 * 1024
+
+# Fallback-кодировки, если определённая chardet не подошла
+FALLBACK_ENCODINGS = ['cp1251', 'utf-8', 'utf-8-sig']
+
+# Метки порядка байтов (UTF-32 проверяется раньше UTF-16 — у них общий префикс)
+_BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Каноническая запись UUID: xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx
+_UUID_RE = re.compile(
+    r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
 
 def gen_uid() -> str:
     """Генерирует уникальный идентификатор."""
@@ -19,7 +50,7 @@ def gen_uid() -> str:
 
 def is_valid_uuid(val) -> bool:
     """
-    Проверяет, является ли строка валидным UUID.
+    Проверяет, является ли строка валидным UUID в канонической записи.
 
     Args:
         val: значение для проверки
@@ -27,18 +58,107 @@ def is_valid_uuid(val) -> bool:
     Returns:
         bool: True если валидный UUID
     """
-    if not isinstance(val, str):
-        return False
-    try:
-        uuid.UUID(val)
-        return True
-    except ValueError:
+    return (isinstance(val, str) and len(val) == 36
+            and _UUID_RE.match(val) is not None)
+
+
+def _v_nonempty(val) -> bool:
+    """Проверка обязательного поля: значение не пустое."""
+    return bool(val) and bool(val.strip())
+
+
+def _v_uuid(val) -> bool:
+    """Проверка обязательного поля '*_uid': значение — UUID."""
+    if not val:
         return False
+    val = val.strip()
+    return len(val) == 36 and _UUID_RE.match(val) is not None
+
+
+def field_validator(field: str) -> Callable[[Any], bool]:
+    """
+    Возвращает функцию проверки обязательного поля.
+
+    Args:
+        field: имя обязательного поля
+
+    Returns:
+        Callable: _v_uuid для полей с '_uid', иначе _v_nonempty
+    """
+    return _v_uuid if '_uid' in field.lower() else _v_nonempty
+
+
+def _field_error(field: str, val) -> str:
+    """Сообщение об ошибке для значения, не прошедшего проверку."""
+    val = val.strip() if val else ''
+    if not val:
+        return f"Поле '{field}' отсутствует или пустое"
+    return f"Поле '{field}' не является валидным UUID: '{val}'"
+
+
+class Table:
+    """
+    Валидные строки CSV, хранящиеся по столбцам.
+    Вместо словаря на каждую строку — по одному списку на столбец.
+    """
+
+    def __init__(self, headers: List[str], cols: Dict[str, list], line_nums: List[int]):
+        """
+        Инициализация таблицы.
+
+        Args:
+            headers: нормализованные имена столбцов
+            cols: значения по столбцам (имя столбца → список значений)
+            line_nums: номера строк исходного файла
+        """
+        self.headers = headers
+        self.cols = cols
+        self.line_nums = line_nums
+        self.n_rows = len(line_nums)
+
+    def iter_rows(self) -> Generator[Tuple[int, 'RowView'], None, None]:
+        """
+        Итерирует строки таблицы.
+
+        Yields:
+            Tuple[int, RowView]: номер строки и представление строки
+        """
+        for i, line_num in enumerate(self.line_nums):
+            yield line_num, RowView(self, i)
+
+
+class RowView(Mapping):
+    """
+    Представление строки таблицы в виде словаря (только чтение).
+    Значения берутся из столбцов таблицы по индексу строки.
+    """
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: Table, index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key: str) -> str:
+        return self.table.cols[key][self.index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.table.headers)
+
+    def __len__(self) -> int:
+        return len(self.table.headers)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
 
 
 def read_encoding(file_path: str) -> str:
     """
     Определяет кодировку файла с помощью chardet.
+    Файл подаётся детектору блоками до уверенного результата
+    (не более ENCODING_MAX_BYTES), а не читается целиком.
+    Результат кэшируется по (путь, mtime, размер) — повторные запуски
+    по неизменённому файлу не читают его заново.
 
     Args:
         file_path: путь к файлу
@@ -49,10 +169,35 @@ def read_encoding(file_path: str) -> str:
     Raises:
         ValueError: если кодировку не удалось определить
     """
-    with open(file_path, 'rb') as f:
-        rawdata = f.read()  # Читаем ВЕСЬ файл для более точного определения
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    return _detect(abs_path, stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _detect(abs_path: str, mtime_ns: int, size: int) -> str:
+    """
+    Определяет кодировку файла (кэшируемая часть read_encoding).
+
+    Args:
+        abs_path: абсолютный путь к файлу
+        mtime_ns: время изменения файла (часть ключа кэша)
+        size: размер файла (часть ключа кэша)
 
-    result = chardet.detect(rawdata)
+    Returns:
+        str: определённая кодировка
+    """
+    detector = UniversalDetector()
+    bytes_fed = 0
+    with open(abs_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(ENCODING_CHUNK_SIZE), b''):
+            detector.feed(chunk)
+            bytes_fed += len(chunk)
+            if detector.done or bytes_fed >= ENCODING_MAX_BYTES:
+                break
+    detector.close()
+
+    result = detector.result
     encoding = result['encoding']
     confidence = result['confidence']
 
@@ -68,12 +213,17 @@ def iter_csv_rows(
     encoding: str,
     required_fields: list,
     logger: Any = None,
-    delimiter: str = None
-) -> Generator[Tuple[int, Dict], None, None]:
+    delimiter: str = None,
+    preloaded_bytes: bytes = None,
+    use_pandas: bool = True
+) -> Generator[Tuple[int, 'RowView'], None, None]:
     """
     Генератор: итерирует валидные строки CSV с номером строки.
     Поддерживает регистронезависимые заголовки.
-    При ошибке декодирования — пробует fallback-кодировки.
+    Файл разбирается целиком в таблицу по столбцам (Table),
+    строки отдаются как RowView.
+    Кодировка по BOM имеет приоритет над переданной; при ошибке
+    декодирования во время разбора — пробует fallback-кодировки.
 
     Args:
         csv_file_path: путь к CSV файлу
@@ -81,65 +231,318 @@ def iter_csv_rows(
         required_fields: список обязательных полей
         logger: объект логгера (опционально)
         delimiter: разделитель в CSV (по умолчанию из конфига)
+        preloaded_bytes: уже прочитанное содержимое файла в байтах
+            (декодируется без повторного чтения с диска)
+        use_pandas: разбирать CSV через pandas.read_csv, если pandas установлен
 
     Yields:
-        Tuple[int, Dict]: номер строки и словарь с данными строки
+        Tuple[int, RowView]: номер строки и данные строки
     """
     if delimiter is None:
         delimiter = get_config_value('csv_processing.default_delimiter', ';')
 
-    # Список кодировок для fallback
-    encodings_to_try = [encoding, 'cp1251', 'utf-8', 'utf-8-sig']
+    log_error = logger.error if logger else None
+
+    try:
+        raw = preloaded_bytes
+        del preloaded_bytes
+        if raw is None:
+            raw = read_file_bytes(csv_file_path)
+        table, row_errors, used_encoding = _read_table_from_bytes(
+            raw, encoding, delimiter, required_fields, use_pandas, logger)
+        del raw
+
+        if logger:
+            logger.info(f"Файл успешно открыт в кодировке: {used_encoding}")
+        if log_error:
+            for msg in row_errors:
+                log_error(msg)
+
+        yield from table.iter_rows()
+
+    except Exception as e:
+        if logger:
+            logger.error(f"Ошибка обработки CSV-файла {csv_file_path}: {e}")
+        return
+
+
+def _sniff_bom(raw: bytes) -> Optional[str]:
+    """
+    Определяет кодировку по метке порядка байтов (BOM).
+
+    Args:
+        raw: начало файла (достаточно 4 байт)
+
+    Returns:
+        str или None, если BOM нет
+    """
+    for bom, enc in _BOMS:
+        if raw.startswith(bom):
+            return enc
+    return None
+
+
+def _open_text(raw: bytes, encoding: str, errors: str = 'strict') -> TextIO:
+    """
+    Открывает байты как текстовый поток с построчным инкрементальным
+    декодированием (без создания строки со всем файлом).
+
+    Args:
+        raw: содержимое файла в байтах
+        encoding: кодировка
+        errors: обработка ошибок декодирования
+
+    Returns:
+        TextIO: текстовый поток (переводы строк — как при чтении файла)
+    """
+    return io.TextIOWrapper(io.BytesIO(raw), encoding=encoding, errors=errors)
+
+
+def _read_table_from_bytes(
+    raw: bytes,
+    encoding: str,
+    delimiter: str,
+    required_fields: list,
+    use_pandas: bool,
+    logger: Any = None
+) -> Tuple[Table, List[str], str]:
+    """
+    Разбирает содержимое файла в таблицу.
+    Кодировка по BOM имеет приоритет; иначе первой пробуется определённая
+    chardet. Следующая кодировка пробуется, только если при разборе
+    возникла ошибка декодирования.
 
-    raw_rows = None
-    used_encoding = None
+    Args:
+        raw: содержимое файла в байтах
+        encoding: кодировка файла (предполагаемая)
+        delimiter: разделитель в CSV
+        required_fields: список обязательных полей
+        use_pandas: разбирать через pandas, если он установлен
+        logger: объект логгера (опционально)
+
+    Returns:
+        Tuple[Table, List[str], str]: таблица, ошибки строк и использованная кодировка
+    """
+    first = _sniff_bom(raw[:4]) or encoding
+    encodings_to_try = [first] + [enc for enc in FALLBACK_ENCODINGS if enc != first]
 
     for enc in encodings_to_try:
         try:
-            with open(csv_file_path, encoding=enc, errors='strict') as csvfile:
-                content = csvfile.read()
-                used_encoding = enc
-                break
+            table, row_errors = _read_table(
+                lambda: _open_text(raw, enc), delimiter, required_fields,
+                use_pandas, logger)
+            return table, row_errors, enc
         except UnicodeDecodeError as e:
             if logger:
                 logger.warning(
                     f"Не удалось открыть файл в кодировке {enc}: {e}")
-            continue
-    else:
-        # Если ни одна кодировка не подошла — читаем с заменой символов
-        with open(csv_file_path, encoding=encoding, errors='replace') as csvfile:
-            content = csvfile.read()
-            used_encoding = encoding
-            if logger:
-                logger.error(
-                    f"Файл открыт с заменой невалидных символов в кодировке {encoding}")
 
+    # Если ни одна кодировка не подошла — декодируем с заменой символов
+    table, row_errors = _read_table(
+        lambda: _open_text(raw, encoding, errors='replace'), delimiter,
+        required_fields, use_pandas, logger)
     if logger:
-        logger.info(f"Файл успешно открыт в кодировке: {used_encoding}")
+        logger.error(
+            f"Файл открыт с заменой невалидных символов в кодировке {encoding}")
+    return table, row_errors, encoding
 
-    try:
-        # Используем StringIO для имитации файла
-        from io import StringIO
-        csvfile = StringIO(content)
-
-        reader = csv.DictReader(csvfile, delimiter=delimiter)
-        reader.fieldnames = [field.strip().lower()
-                             for field in reader.fieldnames]
-
-        for line_num, row in enumerate(reader, start=2):
-            row = {k.strip().lower(): v for k, v in row.items()}
-            ok, err_msg = check_required_fields(row, required_fields)
-            if not ok:
-                if logger:
-                    logger.error(
-                        f"Строка {line_num}: {err_msg}. Данные: {row}")
-                continue
-            yield line_num, row
 
-    except Exception as e:
-        if logger:
-            logger.error(f"Ошибка обработки CSV-файла {csv_file_path}: {e}")
-        return
+def _read_table(
+    open_text: Callable[[], TextIO],
+    delimiter: str,
+    required_fields: list,
+    use_pandas: bool,
+    logger: Any = None
+) -> Tuple[Table, List[str]]:
+    """
+    Разбирает CSV в таблицу через pandas (если доступен) или модуль csv.
+    Ошибки строк накапливаются и возвращаются, а не пишутся в лог сразу:
+    при ошибке декодирования разбор повторяется в другой кодировке.
+
+    Args:
+        open_text: функция, открывающая текстовый поток с содержимым
+        delimiter: разделитель в CSV
+        required_fields: список обязательных полей
+        use_pandas: разбирать через pandas, если он установлен
+        logger: объект логгера (опционально)
+
+    Returns:
+        Tuple[Table, List[str]]: таблица и сообщения об ошибках строк
+
+    Raises:
+        UnicodeDecodeError: если содержимое не декодируется
+    """
+    if use_pandas and pd is not None:
+        row_errors = []
+        try:
+            table = _read_table_pandas(
+                open_text(), delimiter, required_fields, row_errors.append)
+            if table is not None:
+                return table, row_errors
+        except pd.errors.EmptyDataError:
+            pass
+        except pd.errors.ParserError as e:
+            # Строки с лишними полями pandas не принимает — разбираем модулем csv
+            if logger:
+                logger.warning(f"pandas не смог разобрать файл, используется модуль csv: {str(e).strip()}")
+
+    row_errors = []
+    return _read_table_csv(
+        open_text(), delimiter, required_fields, row_errors.append), row_errors
+
+
+def _read_table_csv(
+    stream: TextIO,
+    delimiter: str,
+    required_fields: list,
+    log_error: Any = None
+) -> Table:
+    """
+    Разбирает CSV модулем csv в таблицу валидных строк.
+
+    Args:
+        stream: текстовый поток с содержимым файла
+        delimiter: разделитель в CSV
+        required_fields: список обязательных полей
+        log_error: функция записи ошибок в лог (опционально)
+
+    Returns:
+        Table: валидные строки по столбцам
+    """
+    reader = csv.reader(stream, delimiter=delimiter)
+    headers = [field.strip().lower() for field in next(reader, [])]
+    n_headers = len(headers)
+
+    # Позиции столбцов: при повторе заголовка берётся последний столбец,
+    # как в словаре строки csv.DictReader
+    pos = {name: i for i, name in enumerate(headers)}
+
+    # Позиции обязательных полей и функции проверки вычисляются один раз
+    checks = []
+    for field in required_fields:
+        name = field.strip().lower()
+        checks.append((field, pos.get(name), field_validator(name)))
+
+    valid_rows = []
+    line_nums = []
+    line_num = 1
+    for values in reader:
+        if not values:
+            # Пустые строки пропускаются, как в csv.DictReader
+            continue
+        line_num += 1
+        n_values = len(values)
+
+        err_msg = None
+        for field, i, is_valid in checks:
+            val = values[i] if i is not None and i < n_values else None
+            if not is_valid(val):
+                err_msg = _field_error(field, val)
+                break
+
+        if err_msg:
+            if log_error:
+                log_error(
+                    f"Строка {line_num}: {err_msg}. Данные: {dict(zip(headers, values))}")
+            continue
+
+        if n_values < n_headers:
+            # Недостающие значения — пустые строки (restval=''),
+            # как и при разборе через pandas
+            values += [''] * (n_headers - n_values)
+        valid_rows.append(values)
+        line_nums.append(line_num)
+
+    # Транспонирование строк в столбцы (лишние значения отбрасываются)
+    columns = list(zip(*valid_rows)) if valid_rows else [()] * n_headers
+    del valid_rows
+    cols = dict(zip(headers, map(list, columns)))
+    return Table(list(pos), cols, line_nums)
+
+
+def _read_table_pandas(
+    stream: TextIO,
+    delimiter: str,
+    required_fields: list,
+    log_error: Any = None
+) -> Optional[Table]:
+    """
+    Разбирает CSV через pandas.read_csv (C-движок) в таблицу валидных строк.
+    Проверка обязательных полей выполняется по столбцам целиком.
+
+    Args:
+        stream: текстовый поток с содержимым файла
+        delimiter: разделитель в CSV
+        required_fields: список обязательных полей
+        log_error: функция записи ошибок в лог (опционально)
+
+    Returns:
+        Table или None: валидные строки по столбцам; None — если заголовки
+        повторяются и файл нужно разобрать модулем csv
+    """
+    # Заголовок читается как обычная строка: pandas переименовывает
+    # повторяющиеся столбцы (name, name.1), а модуль csv — нет
+    df = pd.read_csv(stream, sep=delimiter, dtype=str, header=None,
+                     index_col=False, keep_default_na=False, na_filter=False)
+    headers = [h.strip().lower() for h in df.iloc[0].tolist()]
+    if len(set(headers)) != len(headers):
+        return None
+    df = df.iloc[1:].reset_index(drop=True)
+    df.columns = headers
+
+    # Для каждого поля: маска пустых значений, маска невалидных UUID
+    # и очищенные значения (для сообщения об ошибке)
+    valid = pd.Series(True, index=df.index)
+    checks = []
+    for field in required_fields:
+        name = field.strip().lower()
+        if name not in df.columns:
+            empty = pd.Series(True, index=df.index)
+            checks.append((field, empty, None, None))
+            valid &= ~empty
+            continue
+
+        stripped = df[name].str.strip()
+        empty = stripped == ''
+        bad_uid = None
+        if '_uid' in name:
+            is_uuid = (stripped.str.len() == 36) & stripped.str.match(_UUID_RE)
+            bad_uid = ~empty & ~is_uuid
+            valid &= ~bad_uid
+        valid &= ~empty
+        checks.append((field, empty, bad_uid, stripped))
+
+    # Невалидные строки только логируются
+    if log_error:
+        for i in (~valid).to_numpy().nonzero()[0]:
+            for field, empty, bad_uid, stripped in checks:
+                if empty.iat[i]:
+                    err_msg = f"Поле '{field}' отсутствует или пустое"
+                    break
+                if bad_uid is not None and bad_uid.iat[i]:
+                    err_msg = f"Поле '{field}' не является валидным UUID: '{stripped.iat[i]}'"
+                    break
+            log_error(
+                f"Строка {i + 2}: {err_msg}. Данные: {dict(zip(headers, df.iloc[i].tolist()))}")
+
+    df = df[valid]
+    line_nums = [i + 2 for i in valid.to_numpy().nonzero()[0].tolist()]
+    cols = {name: df[name].tolist() for name in headers}
+    return Table(headers, cols, line_nums)
+
+
+def read_file_bytes(file_path: str) -> bytes:
+    """
+    Читает файл целиком в байтах.
+
+    Args:
+        file_path: путь к файлу
+
+    Returns:
+        bytes: содержимое файла
+    """
+    with open(file_path, 'rb') as f:
+        return f.read()
 
 
 def check_required_fields(row: dict, required_fields: list) -> Tuple[bool, str]:
@@ -156,13 +559,10 @@ def check_required_fields(row: dict, required_fields: list) -> Tuple[bool, str]:
     """
     for field in required_fields:
         val = row.get(field)
-        if val is None or not str(val).strip():
-            return False, f"Поле '{field}' отсутствует или пустое"
-
-        if '_uid' in field.lower():
-            uid_str = str(val).strip()
-            if not is_valid_uuid(uid_str):
-                return False, f"Поле '{field}' не является валидным UUID: '{uid_str}'"
+        if val is not None:
+            val = str(val)
+        if not field_validator(field)(val):
+            return False, _field_error(field, val)
 
     return True, ""
 
@@ -176,18 +576,20 @@ def get_csv_files(directory: str, exclude_files: List[str] = None) -> List[str]:
         exclude_files: список файлов для исключения (по умолчанию ['Sample.csv'])
 
     Returns:
-        List[str]: список имен CSV файлов
+        List[str]: отсортированный список имен CSV файлов
     """
     if exclude_files is None:
         exclude_files = get_config_value(
             'file_management.exclude_files', ['Sample.csv'])
 
-    exclude_files = [f.lower() for f in exclude_files]
-    all_files = [
-        f for f in os.listdir(directory)
-        if f.lower().endswith('.csv') and f.lower() not in exclude_files
-    ]
-    return all_files
+    exclude_set = {f.lower() for f in exclude_files}
+    with os.scandir(directory) as it:
+        return sorted(
+            e.name for e in it
+            if e.name.lower().endswith('.csv')
+            and e.name.lower() not in exclude_set
+            and e.is_file()
+        )
 
 
 # Алиасы для обратной совместимости
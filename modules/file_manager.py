@@ -3,6 +3,7 @@
 Ответственность: работа с файловой системой, управление путями
 """
 
+import os
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -40,15 +41,17 @@ class FileManager:
         if exclude_files is None:
             exclude_files
 
-        exclude_files = [f.lower() for f in exclude_files]
+        exclude_set = {f.lower() for f in exclude_files}
         csv_files = []
 
         try:
-            for file_path in self.base_directory.iterdir():
-                if (file_path.is_file() and
-                    file_path.suffix.lower() == '.csv' and
-                        file_path.name.lower() not in exclude_files):
-                    csv_files.append(file_path.name)
+            with os.scandir(self.base_directory) as it:
+                for entry in it:
+                    name = entry.name.lower()
+                    if (name.endswith('.csv') and
+                            name not in exclude_set and
+                            entry.is_file()):
+                        csv_files.append(entry.name)
         except Exception as e:
             raise Exception(
                 f"Ошибка при сканировании директории {self.base_directory}: {e}")
@@ -4,25 +4,154 @@
 Использует только шаблоны и поля из конфигурации.
 """
 
+import os
+import re
 import uuid
 from datetime import datetime
-import lxml.etree as etree
-from lxml.etree import xmlfile
-from typing import Dict, Callable, Any
+from xml.sax.saxutils import escape
+from typing import Dict, Callable, Any, Iterable, Mapping, Optional
 from .config_manager import get_config_value
 import logging
 
 
+# Отступы элементов первого и второго уровня внутри rdf:RDF
+INDENT_1 = '\n  '
+INDENT_2 = '\n    '
+
+# Замены для текста элементов и значений атрибутов (в дополнение к &, <, >)
+_TEXT_ENTITIES = {'\r': '&#13;'}
+_ATTR_ENTITIES = {'"': '&quot;', '\n': '&#10;', '\r': '&#13;', '\t': '&#9;'}
+
+# Символы, недопустимые в XML 1.0 (управляющие, суррогаты, U+FFFE, U+FFFF)
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+
+def _check_xml_chars(value: str) -> None:
+    """
+    Проверяет, что строку можно записать в XML 1.0.
+
+    Raises:
+        ValueError: если строка содержит недопустимый символ
+    """
+    match = _INVALID_XML_CHARS.search(value)
+    if match:
+        raise ValueError(
+            f"Недопустимый в XML символ {match.group()!r} в значении {value!r}")
+
+
+def xml_text(value: str) -> str:
+    """Экранирует текстовое содержимое элемента."""
+    _check_xml_chars(value)
+    return escape(value, _TEXT_ENTITIES)
+
+
+def xml_attr(value: str) -> str:
+    """Экранирует значение атрибута (для записи в двойных кавычках)."""
+    _check_xml_chars(value)
+    return escape(value, _ATTR_ENTITIES)
+
+
+# Переменные части фрагмента структуры роли (параметры AccessXMLGenerator.emit)
+FRAGMENT_FIELDS = ('role_uid', 'privilege_uid', 'datagroup_uid', 'objectref_uid',
+                   'role_name', 'datagroup_name', 'folder_uid', 'object_uid')
+
+
+def compile_template(template: str, fields: tuple) -> Callable[..., str]:
+    """
+    Компилирует шаблон str.format в функцию с f-строкой.
+    Синтаксис полей ({name}, {{ }}) у шаблона и f-строки совпадает,
+    поэтому шаблон становится телом f-строки без преобразований.
+
+    Args:
+        template: шаблон с полями {name}
+        fields: имена полей (параметры функции)
+
+    Returns:
+        Callable: функция fields → str
+    """
+    code = 'def emit(%s):\n    return f%r\n' % (', '.join(fields), template)
+    namespace = {}
+    exec(compile(code, '<fragment_template>', 'exec'), namespace)
+    return namespace['emit']
+
+
+def find_uid_field(fields: Iterable[str]) -> Optional[str]:
+    """
+    Находит первое поле, содержащее '_uid' (UID объекта для ObjectReference).
+
+    Args:
+        fields: имена полей строки CSV
+
+    Returns:
+        str или None, если такого поля нет
+    """
+    return next((f for f in fields if '_uid' in f.lower()), None)
+
+
 def gen_uid() -> str:
     """Генерирует уникальный идентификатор."""
     return str(uuid.uuid4())
 
 
+class UidPool:
+    """
+    Пул случайных UUID версии 4.
+    Случайные байты запрашиваются у os.urandom блоками,
+    а не по 16 байт на каждый идентификатор.
+    """
+
+    def __init__(self, block: int = 4096):
+        """
+        Инициализация пула.
+
+        Args:
+            block: число идентификаторов, генерируемых за один запрос к os.urandom
+        """
+        self.block = block
+        self._hex = ''
+        self._pos = 0
+
+    def _refill(self) -> None:
+        """Запрашивает новый блок случайных байт и выставляет биты версии/варианта."""
+        buf = bytearray(os.urandom(16 * self.block))
+        # RFC 4122: версия 4 в старших битах 7-го байта, вариант 10xx — 9-го
+        buf[6::16] = bytes(b & 0x0F | 0x40 for b in buf[6::16])
+        buf[8::16] = bytes(b & 0x3F | 0x80 for b in buf[8::16])
+        self._hex = buf.hex()
+        self._pos = 0
+
+    def next_str(self) -> str:
+        """
+        Возвращает следующий UUID в канонической записи.
+
+        Returns:
+            str: UUID вида xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx
+        """
+        pos = self._pos
+        if pos >= len(self._hex):
+            self._refill()
+            pos = 0
+        h = self._hex
+        self._pos = pos + 32
+        return (h[pos:pos + 8] + '-' + h[pos + 8:pos + 12] + '-' + h[pos + 12:pos + 16]
+                + '-' + h[pos + 16:pos + 20] + '-' + h[pos + 20:pos + 32])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return self.next_str()
+
+
 class XMLGenerator:
     """
     Базовый генератор XML файлов с настраиваемыми параметрами.
     """
 
+    # Префиксы, которые пишутся в теги как есть: ключи с такими именами
+    # обязаны быть в xml_generation.namespaces (иначе префикс не объявлен)
+    required_prefixes = ('rdf',)
+
     def __init__(self, namespaces: Dict[str, str] = None):
         """
         Инициализация генератора XML.
@@ -35,66 +164,74 @@ class XMLGenerator:
             'csv_processing.model_version') or "1.0.0"
         self.default_model_name = get_config_value(
             'csv_processing.model_name') or "GeneratedModel"
+        self.me_namespace = get_config_value('xml_generation.me_namespace')
 
-    def generate_xml(
+    def generate_xml_str(
         self,
         output_file: str,
         content_generator: Callable,
         encoding: str = 'utf-8'
     ) -> None:
         """
-        Генерирует XML файл используя переданный генератор контента.
+        Генерирует XML файл строковой записью.
+        content_generator получает функцию write(str) и пишет уже
+        сформированные фрагменты с отступами (см. full_model_str,
+        add_role_structure_str) — повторного форматирования файла не требуется.
 
         Args:
             output_file: путь к выходному файлу
             content_generator: функция, генерирующая содержимое
             encoding: кодировка выходного файла
         """
-        with xmlfile(output_file, encoding=encoding) as xf:
-            xf.write_declaration()
-            with xf.element('{%s}RDF' % self.namespaces['rdf'], nsmap=self.namespaces):
-                content_generator(xf)
-
-    def add_full_model(
+        for prefix in self.required_prefixes:
+            if prefix not in self.namespaces:
+                raise KeyError(prefix)
+
+        rdf_prefix = 'rdf'
+        nsdecl = ''.join(' xmlns:%s="%s"' % (prefix, xml_attr(uri))
+                         for prefix, uri in sorted(self.namespaces.items()))
+        with open(output_file, 'w', encoding=encoding, newline='\n') as f:
+            f.write("<?xml version='1.0' encoding='%s'?>\n" % encoding.upper())
+            f.write('<%s:RDF%s>' % (rdf_prefix, nsdecl))
+            content_generator(f.write)
+            f.write('\n</%s:RDF>\n' % rdf_prefix)
+
+    def full_model_str(
         self,
-        xf: xmlfile,
         model_version: str = None,
         model_name: str = None
     ) -> str:
         """
-        Добавляет элемент FullModel с метаданными.
+        Формирует фрагмент FullModel для generate_xml_str.
 
         Args:
-            xf: xmlfile объект
             model_version: версия модели
             model_name: имя модели
 
         Returns:
-            str: UID модели
+            str: XML-фрагмент с отступами
         """
         model_uid = gen_uid()
         model_version = model_version or self.default_model_version
         model_name = model_name or self.default_model_name
+        time_str = datetime.now().strftime('%Y-%m-%dT%H:%M:%S') + "Z"
 
-        with xf.element('{%s}FullModel' % self.namespaces.get('md', ''),
-                        attrib={'{%s}about' % self.namespaces['rdf']: '#_' + model_uid}):
-            time_str = datetime.now().strftime('%Y-%m-%dT%H:%M:%S') + "Z"
+        # Без пространства имён md элементы модели пишутся без префикса
+        md = 'md:' if 'md' in self.namespaces else ''
 
-            with xf.element('{%s}Model.created' % self.namespaces.get('md', '')):
-                xf.write(time_str)
+        if self.me_namespace:
+            name_open = '<me:Model.name xmlns:me="%s">' % xml_attr(self.me_namespace)
+            name_close = '</me:Model.name>'
+        else:
+            name_open, name_close = '<%sModel.name>' % md, '</%sModel.name>' % md
 
-            with xf.element('{%s}Model.version' % self.namespaces.get('md', '')):
-                xf.write(model_version)
-
-            me_namespace = get_config_value('xml_generation.me_namespace')
-            if me_namespace:
-                with xf.element('{%s}Model.name' % me_namespace, nsmap={'me': me_namespace}):
-                    xf.write(model_name)
-            else:
-                with xf.element('{%s}Model.name' % self.namespaces.get('md', '')):
-                    xf.write(model_name)
-
-        return model_uid
+        return (
+            INDENT_1 + '<%sFullModel rdf:about="#_%s">' % (md, model_uid)
+            + INDENT_2 + '<%sModel.created>%s</%sModel.created>' % (md, time_str, md)
+            + INDENT_2 + '<%sModel.version>%s</%sModel.version>' % (md, xml_text(model_version), md)
+            + INDENT_2 + name_open + xml_text(model_name) + name_close
+            + INDENT_1 + '</%sFullModel>' % md
+        )
 
 
 class AccessXMLGenerator(XMLGenerator):
@@ -103,50 +240,146 @@ class AccessXMLGenerator(XMLGenerator):
     Не зависит от семантики полей — использует только конфигурацию.
     """
 
+    required_prefixes = ('rdf', 'cim')
+
     def __init__(self):
         """Инициализация генератора."""
         super().__init__()
 
-    def add_role_structure(
+        self._uid_pool = UidPool()
+
+        # Шаблоны имён и фиксированные ресурсы читаются из конфига один раз
+        self.role_template = get_config_value(
+            'csv_processing.role_template', 'Роль {org_name}')
+        self.datagroup_template = get_config_value(
+            'csv_processing.datagroup_template', 'Группа {org_name}')
+
+        # Фиксированные ресурсы (кроме role_parent_object!)
+        fixed = get_config_value('xml_generation.fixed_resources', {})
+        self.dg_parent = fixed.get('datagroup_parent_object',
+                                   "#_f02c26a7-df3d-43a7-9c61-46d382e31d2c")
+        self.priv_operation = fixed.get(
+            'privilege_operation', "#_200006fe-0000-0000-c000-0000006d746c")
+        self.dg_category = fixed.get('dataitem_category',
+                                     "#_200006ff-0000-0000-c000-0000006d746c")
+        self.dg_class = fixed.get(
+            'datagroup_class', "#_50000709-0000-0000-c000-0000006d746c")
+
+        # Шаблон фрагмента для строковой записи: фиксированные ресурсы
+        # подставлены заранее, переменные части — поля str.format
+        def const(value: str) -> str:
+            return xml_attr(value).replace('{', '{{').replace('}', '}}')
+
+        self.fragment_template = (
+            INDENT_1 + '<cim:Role rdf:about="#_{role_uid}">'
+            + INDENT_2 + '<cim:IdentifiedObject.name>{role_name}</cim:IdentifiedObject.name>'
+            + INDENT_2 + '<cim:IdentifiedObject.ParentObject rdf:resource="#_{folder_uid}"/>'
+            + INDENT_2 + '<cim:Role.kind rdf:resource="cim:RoleKind.allow"/>'
+            + INDENT_2 + '<cim:Role.isHost>false</cim:Role.isHost>'
+            + INDENT_2 + '<cim:Role.isUser>true</cim:Role.isUser>'
+            + INDENT_2 + '<cim:Role.Privileges rdf:resource="#_{privilege_uid}"/>'
+            + INDENT_1 + '</cim:Role>'
+            + INDENT_1 + '<cim:Privilege rdf:about="#_{privilege_uid}">'
+            + INDENT_2 + '<cim:Privilege.Role rdf:resource="#_{role_uid}"/>'
+            + INDENT_2 + '<cim:Privilege.DataItems rdf:resource="#_{datagroup_uid}"/>'
+            + INDENT_2 + '<cim:Privilege.Operation rdf:resource="%s"/>' % const(self.priv_operation)
+            + INDENT_1 + '</cim:Privilege>'
+            + INDENT_1 + '<cim:DataGroup rdf:about="#_{datagroup_uid}">'
+            + INDENT_2 + '<cim:IdentifiedObject.name>{datagroup_name}</cim:IdentifiedObject.name>'
+            + INDENT_2 + '<cim:IdentifiedObject.ParentObject rdf:resource="%s"/>' % const(self.dg_parent)
+            + INDENT_2 + '<cim:DataItem.isHostRestricted>false</cim:DataItem.isHostRestricted>'
+            + INDENT_2 + '<cim:DataItem.isUserRestricted>true</cim:DataItem.isUserRestricted>'
+            + INDENT_2 + '<cim:DataItem.Privileges rdf:resource="#_{privilege_uid}"/>'
+            + INDENT_2 + '<cim:DataItem.Category rdf:resource="%s"/>' % const(self.dg_category)
+            + INDENT_2 + '<cim:DataGroup.Class rdf:resource="%s"/>' % const(self.dg_class)
+            + INDENT_2 + '<cim:DataGroup.Objects rdf:resource="#_{objectref_uid}"/>'
+            + INDENT_1 + '</cim:DataGroup>'
+            + INDENT_1 + '<cim:ObjectReference rdf:about="#_{objectref_uid}">'
+            + INDENT_2 + '<cim:ObjectReference.objectUid>{object_uid}</cim:ObjectReference.objectUid>'
+            + INDENT_2 + '<cim:ObjectReference.Group rdf:resource="#_{datagroup_uid}"/>'
+            + INDENT_1 + '</cim:ObjectReference>'
+        )
+        # Функция emit(role_uid, ..., object_uid) -> str; значения экранирует вызывающий
+        self.emit = compile_template(self.fragment_template, FRAGMENT_FIELDS)
+
+    def add_role_structure_str(
         self,
-        xf: xmlfile,
-        data: Dict[str, str],
-        folder_uid: str,  # ← UID папки, указанный пользователем
-        logger: logging.Logger = None
-    ) -> None:
+        data: Mapping[str, str],
+        folder_uid: str,
+        logger: logging.Logger = None,
+        object_uid_field: str = None
+    ) -> str:
         """
-        Генерирует универсальную структуру: Role → Privilege → DataGroup → ObjectReference.
+        Генерирует универсальную структуру: Role → Privilege → DataGroup → ObjectReference
+        в виде строки (функцией emit, скомпилированной из шаблона фрагмента).
         Все имена полей и шаблоны берутся из конфига.
         ParentObject для Role = folder_uid, указанный пользователем.
 
         Args:
-            xf: xmlfile объект
-            data: словарь с данными строки CSV
+            data: данные строки CSV (словарь или RowView)
             folder_uid: UID папки для ролей (указанный пользователем)
             logger: логгер для записи событий
+            object_uid_field: поле с UID объекта (если не передано —
+                ищется в data; при потоковой обработке вычисляется один раз на файл)
+
+        Returns:
+            str: XML-фрагмент с отступами
         """
+        (role_uid, privilege_uid, datagroup_uid, objectref_uid,
+         role_name, datagroup_name, object_uid_field) = self._prepare_role(
+            data, logger, object_uid_field)
+
+        fragment = self.emit(
+            role_uid, privilege_uid, datagroup_uid, objectref_uid,
+            xml_text(role_name), xml_text(datagroup_name),
+            xml_attr(folder_uid), xml_text(data[object_uid_field])
+        )
+
         if logger:
-            object_uid_field = next(
-                (f for f in data.keys() if '_uid' in f.lower()), 'object_uid')
-            object_uid = data.get(object_uid_field, 'unknown')
             logger.debug(
-                f"Начало генерации структуры для {object_uid_field}={object_uid}")
+                f"Структура для {object_uid_field}={data[object_uid_field]} успешно сгенерирована")
+        return fragment
 
-        role_uid = gen_uid()
-        privilege_uid = gen_uid()
-        datagroup_uid = gen_uid()
-        objectref_uid = gen_uid()
+    def _prepare_role(
+        self,
+        data: Mapping[str, str],
+        logger: logging.Logger = None,
+        object_uid_field: str = None
+    ) -> tuple:
+        """
+        Генерирует UID и имена для структуры роли.
 
-        # Получаем шаблоны из конфига
-        role_template = get_config_value(
-            'csv_processing.role_template', 'Роль {org_name}')
-        datagroup_template = get_config_value(
-            'csv_processing.datagroup_template', 'Группа {org_name}')
+        Args:
+            data: данные строки CSV (словарь или RowView)
+            logger: логгер для записи событий
+            object_uid_field: поле с UID объекта (если не передано — ищется в data)
+
+        Returns:
+            tuple: (role_uid, privilege_uid, datagroup_uid, objectref_uid,
+                    role_name, datagroup_name, object_uid_field)
+
+        Raises:
+            KeyError: если в данных нет поля из шаблона имени
+            ValueError: если в данных нет поля, содержащего '_uid'
+        """
+        if object_uid_field is None:
+            object_uid_field = find_uid_field(data.keys())
+
+        if logger:
+            log_field = object_uid_field or 'object_uid'
+            logger.debug(
+                f"Начало генерации структуры для {log_field}={data.get(log_field, 'unknown')}")
+
+        next_uid = self._uid_pool.next_str
+        role_uid = next_uid()
+        privilege_uid = next_uid()
+        datagroup_uid = next_uid()
+        objectref_uid = next_uid()
 
-        # Форматируем имена
+        # Форматируем имена (format_map не копирует словарь строки)
         try:
-            role_name = role_template.format(**data)
-            datagroup_name = datagroup_template.format(**data)
+            role_name = self.role_template.format_map(data)
+            datagroup_name = self.datagroup_template.format_map(data)
         except KeyError as e:
             if logger:
                 logger.error(
@@ -159,108 +392,12 @@ class AccessXMLGenerator(XMLGenerator):
             logger.debug(
                 f"Имена: Role='{role_name}', DataGroup='{datagroup_name}'")
 
-        # Получаем фиксированные ресурсы из конфига (кроме role_parent_object!)
-        fixed = get_config_value('xml_generation.fixed_resources', {})
-        dg_parent = fixed.get('datagroup_parent_object',
-                              "#_f02c26a7-df3d-43a7-9c61-46d382e31d2c")
-        priv_operation = fixed.get(
-            'privilege_operation', "#_200006fe-0000-0000-c000-0000006d746c")
-        dg_category = fixed.get('dataitem_category',
-                                "#_200006ff-0000-0000-c000-0000006d746c")
-        dg_class = fixed.get(
-            'datagroup_class', "#_50000709-0000-0000-c000-0000006d746c")
-
-        # === Role ===
-        with xf.element('{%s}Role' % self.namespaces['cim'],
-                        attrib={'{%s}about' % self.namespaces['rdf']: "#_" + role_uid}):
-            with xf.element('{%s}IdentifiedObject.name' % self.namespaces['cim']):
-                xf.write(role_name)
-            # ❗❗❗ ВАЖНО: ParentObject = folder_uid, указанный пользователем
-            with xf.element('{%s}IdentifiedObject.ParentObject' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: "#_" + folder_uid}):
-                pass
-            with xf.element('{%s}Role.kind' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: "cim:RoleKind.allow"}):
-                pass
-            with xf.element('{%s}Role.isHost' % self.namespaces['cim']):
-                xf.write('false')
-            with xf.element('{%s}Role.isUser' % self.namespaces['cim']):
-                xf.write('true')
-            with xf.element('{%s}Role.Privileges' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: "#_" + privilege_uid}):
-                pass
-
-        # === Privilege ===
-        with xf.element('{%s}Privilege' % self.namespaces['cim'],
-                        attrib={'{%s}about' % self.namespaces['rdf']: "#_" + privilege_uid}):
-            with xf.element('{%s}Privilege.Role' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: "#_" + role_uid}):
-                pass
-            with xf.element('{%s}Privilege.DataItems' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: "#_" + datagroup_uid}):
-                pass
-            with xf.element('{%s}Privilege.Operation' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: priv_operation}):
-                pass
-
-        # === DataGroup ===
-        with xf.element('{%s}DataGroup' % self.namespaces['cim'],
-                        attrib={'{%s}about' % self.namespaces['rdf']: "#_" + datagroup_uid}):
-            with xf.element('{%s}IdentifiedObject.name' % self.namespaces['cim']):
-                xf.write(datagroup_name)
-            with xf.element('{%s}IdentifiedObject.ParentObject' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: dg_parent}):
-                pass
-            with xf.element('{%s}DataItem.isHostRestricted' % self.namespaces['cim']):
-                xf.write('false')
-            with xf.element('{%s}DataItem.isUserRestricted' % self.namespaces['cim']):
-                xf.write('true')
-            with xf.element('{%s}DataItem.Privileges' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: "#_" + privilege_uid}):
-                pass
-            with xf.element('{%s}DataItem.Category' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: dg_category}):
-                pass
-            with xf.element('{%s}DataGroup.Class' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: dg_class}):
-                pass
-            with xf.element('{%s}DataGroup.Objects' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: "#_" + objectref_uid}):
-                pass
-
-        # === ObjectReference ===
-        object_uid_field = next(
-            (f for f in data.keys() if '_uid' in f.lower()), None)
         if not object_uid_field:
             raise ValueError(
                 "Не найдено поле, содержащее '_uid' для ObjectReference.objectUid")
 
-        with xf.element('{%s}ObjectReference' % self.namespaces['cim'],
-                        attrib={'{%s}about' % self.namespaces['rdf']: "#_" + objectref_uid}):
-            with xf.element('{%s}ObjectReference.objectUid' % self.namespaces['cim']):
-                xf.write(data[object_uid_field])
-            with xf.element('{%s}ObjectReference.Group' % self.namespaces['cim'],
-                            attrib={'{%s}resource' % self.namespaces['rdf']: "#_" + datagroup_uid}):
-                pass
-
-        if logger:
-            logger.debug(
-                f"Структура для {object_uid_field}={data[object_uid_field]} успешно сгенерирована")
-
-
-def format_xml_pretty(file_path: str) -> None:
-    """
-    Читает XML и записывает с отступами (pretty print).
-
-    Args:
-        file_path: путь к XML-файлу
-    """
-    parser = etree.XMLParser(remove_blank_text=False, encoding='utf-8')
-    tree = etree.parse(file_path, parser)
-    root = tree.getroot()
-    etree.indent(root, space="  ")
-    tree.write(file_path, encoding="utf-8",
-               xml_declaration=True, pretty_print=True)
+        return (role_uid, privilege_uid, datagroup_uid, objectref_uid,
+                role_name, datagroup_name, object_uid_field)
 
 
 # Фабричная функция
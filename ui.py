@@ -1,6 +1,7 @@
 import sys
 import os
 import threading
+import multiprocessing
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
@@ -542,4 +543,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # Нужно для пула процессов в собранном .exe
+    multiprocessing.freeze_support()
     main()
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=['.'],
     binaries=[],
     datas=[('config.json', '.'), ('modules', 'modules')],
-    hiddenimports=['main', 'ui', 'modules.config_manager', 'modules.csv_processor', 'modules.csv_reader', 'modules.file_manager', 'modules.logger_manager', 'modules.xml_generator', 'PyQt5', 'PyQt5.QtWidgets', 'PyQt5.QtCore', 'PyQt5.QtGui', 'lxml', 'lxml.etree', 'lxml._elementpath', 'chardet', 'chardet.universaldetector'],
+    hiddenimports=['main', 'ui', 'modules.config_manager', 'modules.csv_processor', 'modules.csv_reader', 'modules.file_manager', 'modules.logger_manager', 'modules.xml_generator', 'PyQt5', 'PyQt5.QtWidgets', 'PyQt5.QtCore', 'PyQt5.QtGui', 'chardet', 'chardet.universaldetector'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],